@@ -2,20 +2,44 @@
 German30 Trading Strategy Simulator - Main Flask Application
 """
 from flask import Flask
-from flask_cors import CORS
+from werkzeug.utils import import_string
 from config import Config
 from models import init_db
+import logging
 import os
 
 
+# Blueprints as (import path, url prefix); resolved inside create_app
+BLUEPRINTS = (
+    ('routes.views:views_bp', None),
+    ('routes.api:api_bp', '/api'),
+)
+
+
 def create_app(config_class=Config):
     """Application factory pattern"""
 
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    # Enable CORS for API endpoints
-    CORS(app)
+    # Serialize JSON responses with orjson (imported here like flask_cors)
+    from json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+
+    # Configure logging once; verbose output only in debug mode
+    logging.basicConfig(
+        level=logging.INFO if app.debug else logging.WARNING,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+    # Register blueprints
+    for import_path, url_prefix in BLUEPRINTS:
+        app.register_blueprint(import_string(import_path), url_prefix=url_prefix)
+
+    # Enable CORS for API endpoints only; browsers may cache preflights for a day
+    # (imported here to keep module import light)
+    from flask_cors import CORS
+    CORS(app, resources={r'/api/*': {'origins': '*', 'max_age': 86400}})
 
     # Ensure data directory exists
     os.makedirs(os.path.join(app.config['BASE_DIR'], 'data'), exist_ok=True)
@@ -23,28 +47,16 @@ def create_app(config_class=Config):
     # Initialize database
     init_db(app)
 
-    # Register blueprints
-    from routes.views import views_bp
-    from routes.api import api_bp
-
-    app.register_blueprint(views_bp)
-    app.register_blueprint(api_bp, url_prefix='/api')
+    # Compile the trade scoring kernel up front rather than on the first trade
+    import scoring
+    scoring.warm_up()
 
     # Context processor to inject config into templates
     @app.context_processor
     def inject_config():
-        # Convert time objects to JSON-serializable format
-        time_windows_serializable = {}
-        for key, window in Config.TIME_WINDOWS.items():
-            time_windows_serializable[key] = {
-                'label': window['label'],
-                'start': window['start'].strftime('%H:%M'),
-                'end': window['end'].strftime('%H:%M')
-            }
-
         return {
             'config': Config,
-            'time_windows': time_windows_serializable
+            'time_windows': Config.TIME_WINDOWS_SERIALIZABLE
         }
 
     # Error handlers
@@ -15,9 +15,15 @@ class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(BASE_DIR, "data", "cache.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Keep warm connections for concurrent requests and the parallel cache
+    # reads; Flask-SQLAlchemy removes the scoped session on teardown
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20
+    }
 
     # Trading Rules - CRITICAL PARAMETERS
-    VALID_DAYS = ['Monday', 'Thursday', 'Friday']
+    VALID_DAYS = ('Monday', 'Thursday', 'Friday')
 
     # Time windows in BST (GMT+1)
     TIME_WINDOWS = {
@@ -43,6 +49,16 @@ class Config:
         }
     }
 
+    # JSON-serializable copy of TIME_WINDOWS for templates, built once
+    TIME_WINDOWS_SERIALIZABLE = {
+        key: {
+            'label': window['label'],
+            'start': window['start'].strftime('%H:%M'),
+            'end': window['end'].strftime('%H:%M')
+        }
+        for key, window in TIME_WINDOWS.items()
+    }
+
     # Risk Management
     STOP_LOSS_POINTS = 18
     RISK_REWARD_RATIO = 3
@@ -54,6 +70,12 @@ class Config:
     RESAMPLE_TIMEFRAME = '3min'  # Resample to 3-minute candles
     CACHE_EXPIRY_DAYS = 30
 
+    # Yahoo Finance request throttling / retry
+    YF_REQUESTS_PER_MINUTE = 30  # Token-bucket refill rate (1 request / 2s)
+    YF_MAX_RETRIES = 5  # Attempts per fetch on transient errors
+    YF_BACKOFF_BASE = 2  # Exponential backoff base in seconds
+    YF_BACKOFF_MAX = 60  # Cap on a single backoff sleep in seconds
+
     # Supported timeframes for multi-timeframe analysis
     TIMEFRAMES = ['4h', '1h', '3m']
 
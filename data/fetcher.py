@@ -1,21 +1,165 @@
 """
 Data fetcher module - handles data acquisition from yfinance
+
+Heavy dependencies (yfinance, pandas) are imported lazily.
 """
-import yfinance as yf
-import pandas as pd
-import pytz
+import itertools
+import logging
+import random
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from types import MappingProxyType
+from zoneinfo import ZoneInfo
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from sqlalchemy import BigInteger, select, type_coerce
 from config import Config
 from models import db
 from models.candle import Candle
 
+logger = logging.getLogger(__name__)
+
+UTC = ZoneInfo('UTC')
+
+# Cached-read columns: raw int64 ns timestamps plus OHLCV under the
+# capitalized names the rest of the pipeline expects
+CACHED_CANDLE_COLUMNS = (
+    type_coerce(Candle.timestamp, BigInteger).label('timestamp'),
+    Candle.open.label('Open'),
+    Candle.high.label('High'),
+    Candle.low.label('Low'),
+    Candle.close.label('Close'),
+    Candle.volume.label('Volume'),
+)
+
+# Raw DB-API insert used by the fused write path (no ORM objects per row)
+INSERT_CANDLES_SQL = (
+    'INSERT OR IGNORE INTO candles '
+    '(timeframe, timestamp, open, high, low, close, volume, bst_minute_of_day, created_at) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+# Text format SQLAlchemy's SQLite DateTime type reads and writes (created_at)
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Shared keep-alive HTTP session and per-symbol Ticker cache, so cookie/crumb
+# acquisition and TLS setup happen once per process instead of once per fetch
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(
+    pool_connections=len(Config.TIMEFRAMES),
+    pool_maxsize=len(Config.TIMEFRAMES)
+))
+_tickers = {}
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the sustained request rate"""
+
+    def __init__(self, rate_per_minute, capacity=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+# Errors worth retrying if they escape yfinance: network blips
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+# yfinance swallows timeouts, connection errors and 429s and raises with one
+# of these messages instead; Yahoo's own "no data" answers carry metadata
+NO_RESPONSE_ERRORS = ('No price data found', 'No timezone found')
+
+_rate_limiter = TokenBucket(Config.YF_REQUESTS_PER_MINUTE)
+
+# OHLCV columns and how each aggregates when resampling
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+# Timeframe strings mapped to pandas resample rules
+TIMEFRAME_RULES = MappingProxyType({
+    '1m': '1min',
+    '3m': '3min',
+    '5m': '5min',
+    '15m': '15min',
+    '1h': '1h',
+    '4h': '4h',
+    '1d': '1D'
+})
+
+# Finest Yahoo Finance interval available by age of the range start (days)
+# - 1m data: last 7 days only
+# - 5m data: last 60 days
+# - 15m/30m/60m/90m: last 60 days
+# - 1h: last 730 days
+BASE_INTERVAL_BY_AGE = (
+    (7, '1m'),
+    (60, '5m'),
+    (float('inf'), '1h'),  # For older data, use hourly and downsample
+)
+
+# In-memory column dtypes. Prices stay float64: DAX quotes carry two decimals
+# and float32 rounding would move SL/TP touch comparisons and leak into JSON
+OHLCV_DTYPES = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Volume': 'int32'
+}
+
+
+def get_ticker(symbol):
+    """Get the shared yfinance Ticker for a symbol"""
+    ticker = _tickers.get(symbol)
+    if ticker is None:
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol, session=_http_session)
+        _tickers[symbol] = ticker
+    return ticker
+
 
 class DataFetcher:
     """Fetches and caches German30 historical data"""
 
     def __init__(self):
         self.symbol = Config.GERMAN30_SYMBOL
-        self.data_timezone = pytz.timezone(Config.DATA_TIMEZONE)
+
+    @property
+    def data_timezone(self):
+        """Timezone cached data is stored in"""
+        return ZoneInfo(Config.DATA_TIMEZONE)
+
+    @property
+    def _ticker(self):
+        """Shared yfinance Ticker, created on first fetch"""
+        return get_ticker(self.symbol)
 
     def fetch_german30_data(self, start_date, end_date, interval='1m'):
         """
@@ -30,7 +174,7 @@ class DataFetcher:
             pandas DataFrame with OHLCV data or None on error
         """
         try:
-            print(f"Fetching {self.symbol} data from {start_date} to {end_date} ({interval})...")
+            logger.info("Fetching %s data from %s to %s (%s)...", self.symbol, start_date, end_date, interval)
 
             # Convert dates to string format if needed
             if isinstance(start_date, datetime):
@@ -44,8 +188,7 @@ class DataFetcher:
                 end_str = end_date
 
             # Fetch data from yfinance
-            ticker = yf.Ticker(self.symbol)
-            df = ticker.history(
+            df = self._history_with_retry(
                 start=start_str,
                 end=end_str,
                 interval=interval,
@@ -54,22 +197,71 @@ class DataFetcher:
             )
 
             if df.empty:
-                print(f"No data returned for {start_str} to {end_str}")
+                logger.warning("No data returned for %s to %s", start_str, end_str)
                 return None
 
-            # Ensure timezone is UTC
-            if df.index.tz is None:
-                df.index = df.index.tz_localize('UTC')
-            else:
-                df.index = df.index.tz_convert('UTC')
+            df = self._normalize_frame(df)
 
-            print(f"Successfully fetched {len(df)} candles")
+            logger.info("Successfully fetched %d candles", len(df))
             return df
 
         except Exception as e:
-            print(f"Error fetching data: {e}")
+            logger.error("Error fetching data: %s", e)
             return None
 
+    def _normalize_frame(self, df):
+        """Convert a yfinance frame to UTC-indexed OHLCV with pinned dtypes"""
+        # Ensure timezone is UTC
+        if df.index.tz is None:
+            df.index = df.index.tz_localize(UTC)
+        else:
+            df.index = df.index.tz_convert(UTC)
+
+        return self._apply_dtypes(df[OHLCV_COLUMNS])
+
+    def _history_with_retry(self, **kwargs):
+        """
+        Call Ticker.history behind the rate limiter, retrying transient
+        failures with exponential backoff and full jitter
+
+        Args:
+            **kwargs: Arguments forwarded to Ticker.history
+
+        Returns:
+            pandas DataFrame returned by yfinance
+        """
+        for attempt in range(1, Config.YF_MAX_RETRIES + 1):
+            _rate_limiter.acquire()
+            try:
+                return self._ticker.history(raise_errors=True, **kwargs)
+            except Exception as e:
+                if attempt == Config.YF_MAX_RETRIES or not self._is_transient(e):
+                    raise
+
+                delay = random.uniform(0, min(Config.YF_BACKOFF_MAX, Config.YF_BACKOFF_BASE ** attempt))
+                logger.warning("Fetch attempt %d/%d failed (%s), retrying in %.1fs",
+                               attempt, Config.YF_MAX_RETRIES, e, delay)
+                time.sleep(delay)
+
+    def _is_transient(self, error):
+        """
+        Whether a failed history call never got a usable answer from Yahoo
+
+        Args:
+            error: Exception raised by Ticker.history
+
+        Returns:
+            True if the call is worth retrying
+        """
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+
+        # An empty chart response still records its metadata, so a permanent
+        # "no data for this range" is not retried
+        message = str(error)
+        return (not self._ticker.history_metadata
+                and any(marker in message for marker in NO_RESPONSE_ERRORS))
+
     def resample_to_3min(self, df):
         """
         Resample 1-minute data to 3-minute candles
@@ -85,22 +277,16 @@ class DataFetcher:
 
         try:
             # Resample to 3-minute intervals
-            resampled = df.resample('3T').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            })
+            resampled = self._resample_ohlcv(df, '3min')
 
             # Drop rows with NaN (incomplete candles)
-            resampled = resampled.dropna()
+            resampled = self._apply_dtypes(resampled.dropna())
 
-            print(f"Resampled to {len(resampled)} 3-minute candles")
+            logger.debug("Resampled to %d 3-minute candles", len(resampled))
             return resampled
 
         except Exception as e:
-            print(f"Error resampling data: {e}")
+            logger.error("Error resampling data: %s", e)
             return None
 
     def resample_to_timeframe(self, df, timeframe):
@@ -117,38 +303,39 @@ class DataFetcher:
         if df is None or df.empty:
             return None
 
-        # Map timeframe strings to pandas resample rules
-        timeframe_map = {
-            '1m': '1T',
-            '3m': '3T',
-            '5m': '5T',
-            '15m': '15T',
-            '1h': '1H',
-            '4h': '4H',
-            '1d': '1D'
-        }
-
-        resample_rule = timeframe_map.get(timeframe)
+        resample_rule = TIMEFRAME_RULES.get(timeframe)
         if not resample_rule:
-            print(f"Unknown timeframe: {timeframe}")
+            logger.warning("Unknown timeframe: %s", timeframe)
             return None
 
         try:
-            resampled = df.resample(resample_rule).agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            })
-
-            resampled = resampled.dropna()
+            resampled = self._resample_ohlcv(df, resample_rule)
+
+            resampled = self._apply_dtypes(resampled.dropna())
             return resampled
 
         except Exception as e:
-            print(f"Error resampling to {timeframe}: {e}")
+            logger.error("Error resampling to %s: %s", timeframe, e)
             return None
 
+    def _resample_ohlcv(self, df, rule):
+        """
+        Resample OHLCV columns in one pass over contiguous float64 data
+
+        Args:
+            df: DataFrame with OHLCV data
+            rule: pandas offset alias ('3min', '1h', ...)
+
+        Returns:
+            Resampled DataFrame (empty bins still present as NaN)
+        """
+        ohlcv = df[OHLCV_COLUMNS].astype('float64', copy=False)
+        return ohlcv.resample(rule, label='left', closed='left').agg(OHLCV_AGG)
+
+    def _apply_dtypes(self, df):
+        """Cast OHLCV columns to OHLCV_DTYPES (missing volume counts as 0)"""
+        return df.fillna({'Volume': 0}).astype(OHLCV_DTYPES, copy=False)
+
     def cache_data(self, df, timeframe):
         """
         Cache DataFrame to database
@@ -160,32 +347,57 @@ class DataFetcher:
         Returns:
             Number of candles cached
         """
+        return self._write_frame(df, timeframe)
+
+    def _write_frame(self, df, timeframe):
+        """
+        Write a DataFrame straight to the candles table
+
+        Column buffers are zipped into DB-API tuples and sent as one
+        INSERT OR IGNORE executemany; the primary key skips cached candles.
+
+        Args:
+            df: DataFrame with OHLCV data
+            timeframe: Timeframe string
+
+        Returns:
+            Number of new candles written
+        """
         if df is None or df.empty:
             return 0
 
         try:
-            cached_count = 0
-            candles_to_insert = []
+            # Timestamps go in as int64 UTC nanoseconds straight from the index
+            index = df.index.tz_localize(UTC) if df.index.tz is None else df.index
+            created_at = datetime.utcnow().strftime(SQLITE_DATETIME_FORMAT)
+
+            # Display-time minute of day, computed once here for window queries
+            local_index = index.tz_convert(Config.DISPLAY_TIMEZONE).tz_localize(None)
+            minute_of_day = local_index.hour.values * 60 + local_index.minute.values
 
-            for timestamp, row in df.iterrows():
-                # Check if candle already exists
-                if not Candle.exists(timestamp.to_pydatetime(), timeframe):
-                    candle = Candle.from_series(row, timeframe)
-                    candles_to_insert.append(candle)
+            rows = list(zip(
+                itertools.repeat(timeframe),
+                index.asi8.tolist(),
+                *(df[col].to_numpy(dtype='float64').tolist() for col in OHLCV_COLUMNS),
+                minute_of_day.tolist(),
+                itertools.repeat(created_at)
+            ))
 
-            # Bulk insert new candles
-            if candles_to_insert:
-                Candle.bulk_insert(candles_to_insert)
-                cached_count = len(candles_to_insert)
-                print(f"Cached {cached_count} new {timeframe} candles")
+            result = db.session.connection().exec_driver_sql(INSERT_CANDLES_SQL, rows)
+            db.session.commit()
+
+            cached_count = max(result.rowcount, 0)
+            if cached_count:
+                logger.debug("Cached %d new %s candles", cached_count, timeframe)
 
             return cached_count
 
         except Exception as e:
-            print(f"Error caching data: {e}")
+            db.session.rollback()
+            logger.error("Error caching data: %s", e)
             return 0
 
-    def get_cached_data(self, start_date, end_date, timeframe):
+    def get_cached_data(self, start_date, end_date, timeframe, minute_range=None):
         """
         Retrieve cached data from database
 
@@ -193,33 +405,43 @@ class DataFetcher:
             start_date: Start datetime
             end_date: End datetime
             timeframe: Timeframe string
+            minute_range: Optional (first, last) display-time minute of day
 
         Returns:
             pandas DataFrame with cached data or None
         """
+        import pandas as pd
+
         try:
-            candles = Candle.get_range(start_date, end_date, timeframe)
+            # Served by the primary key, or idx_tf_bstmod_ts for a minute band
+            query = select(*CACHED_CANDLE_COLUMNS).where(
+                Candle.timeframe == timeframe,
+                Candle.timestamp.between(start_date, end_date)
+            )
+            if minute_range is not None:
+                query = query.where(Candle.bst_minute_of_day.between(*minute_range))
+            query = query.order_by(Candle.timestamp)
+
+            # Read straight into typed columns, no ORM instances
+            with db.engine.connect() as conn:
+                df = pd.read_sql_query(
+                    query,
+                    conn,
+                    index_col='timestamp',
+                    parse_dates={'timestamp': {'unit': 'ns', 'utc': True}},
+                    dtype=OHLCV_DTYPES
+                )
 
-            if not candles:
+            if df.empty:
                 return None
 
-            # Convert to DataFrame
-            data = {
-                'Open': [c.open for c in candles],
-                'High': [c.high for c in candles],
-                'Low': [c.low for c in candles],
-                'Close': [c.close for c in candles],
-                'Volume': [c.volume for c in candles]
-            }
+            df.index.name = None
 
-            df = pd.DataFrame(data, index=[c.timestamp for c in candles])
-            df.index = df.index.tz_localize('UTC') if df.index.tz is None else df.index
-
-            print(f"Retrieved {len(df)} cached {timeframe} candles")
+            logger.debug("Retrieved %d cached %s candles", len(df), timeframe)
             return df
 
         except Exception as e:
-            print(f"Error retrieving cached data: {e}")
+            logger.error("Error retrieving cached data: %s", e)
             return None
 
     def fetch_and_cache(self, start_date, end_date, timeframe='3m', force_refresh=False):
@@ -235,61 +457,131 @@ class DataFetcher:
         Returns:
             pandas DataFrame with OHLCV data
         """
+        data = self.fetch_multiframe_data(start_date, end_date, [timeframe], force_refresh=force_refresh)
+        return data.get(timeframe)
+
+    def fetch_multiframe_data(self, start_date, end_date, timeframes=['4h', '1h', '3m'], force_refresh=False):
+        """
+        Fetch data for multiple timeframes
+
+        Cached timeframes are read from the database concurrently, one
+        worker per timeframe. All remaining timeframes are derived from a
+        single base-interval download.
+
+        Args:
+            start_date: Start date
+            end_date: End date
+            timeframes: List of timeframe strings
+            force_refresh: Force re-fetch even if cached
+
+        Returns:
+            Dictionary mapping timeframe to DataFrame
+        """
         # Convert string dates to datetime
         if isinstance(start_date, str):
-            start_date = datetime.strptime(start_date, '%Y-%m-%d')
+            start_date = datetime.fromisoformat(start_date)
         if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, '%Y-%m-%d')
+            end_date = datetime.fromisoformat(end_date)
 
         # Make timezone-aware
         if start_date.tzinfo is None:
-            start_date = pytz.UTC.localize(start_date)
+            start_date = start_date.replace(tzinfo=UTC)
         if end_date.tzinfo is None:
-            end_date = pytz.UTC.localize(end_date)
+            end_date = end_date.replace(tzinfo=UTC)
+
+        result = {}
+        missing = []
+
+        # Try to get cached data first; reads are independent I/O, so with
+        # several timeframes each gets its own worker (and app context / DB
+        # session), while a single one is read in the calling thread
+        cached = {}
+        if not force_refresh and len(timeframes) > 1:
+            app = current_app._get_current_object()
+            with ThreadPoolExecutor(max_workers=len(timeframes)) as executor:
+                futures = {
+                    tf: executor.submit(self._read_cached_in_worker, app, start_date, end_date, tf)
+                    for tf in timeframes
+                }
+                cached = {tf: future.result() for tf, future in futures.items()}
+        elif not force_refresh:
+            cached = {tf: self._read_cached(start_date, end_date, tf) for tf in timeframes}
 
-        # Try to get cached data first
-        if not force_refresh:
-            cached_df = self.get_cached_data(start_date, end_date, timeframe)
+        for tf in timeframes:
+            cached_df = cached.get(tf)
             if cached_df is not None and not cached_df.empty:
-                print(f"Using cached data for {timeframe}")
-                return cached_df
+                logger.debug("Using cached data for %s", tf)
+                result[tf] = cached_df
+            else:
+                missing.append(tf)
+
+        if not missing:
+            return result
 
-        # Fetch fresh data
-        print(f"Fetching fresh data for {timeframe}...")
+        # Fetch fresh data once for every uncached timeframe
+        logger.info("Fetching fresh data for %s...", ', '.join(missing))
 
         # Determine best interval based on date range
-        # Yahoo Finance limitations:
-        # - 1m data: last 7 days only
-        # - 5m data: last 60 days
-        # - 15m/30m/60m/90m: last 60 days
-        # - 1h: last 730 days
-
-        from datetime import timedelta
-        days_ago = (datetime.now(pytz.UTC) - start_date).days
-
-        # Choose appropriate base interval
-        if days_ago <= 7:
-            base_interval = '1m'
-        elif days_ago <= 60:
-            base_interval = '5m'
-        else:
-            # For older data, use hourly and downsample
-            base_interval = '1h'
+        days_ago = (datetime.now(UTC) - start_date).days
+        base_interval = next(interval for age, interval in BASE_INTERVAL_BY_AGE if days_ago <= age)
 
-        print(f"Using {base_interval} interval (data from {days_ago} days ago)")
+        logger.info("Using %s interval (data from %d days ago)", base_interval, days_ago)
 
         # Fetch base data
         df_base = self.fetch_german30_data(start_date, end_date, interval=base_interval)
 
         if df_base is None or df_base.empty:
-            print(f"Failed to fetch {base_interval} data")
-            print(f"Yahoo Finance may not have data for {start_date.date()} to {end_date.date()}")
-            print(f"Try using dates within the last 7 days for best results")
-            return None
+            logger.warning("Failed to fetch %s data", base_interval)
+            logger.warning("Yahoo Finance may not have data for %s to %s", start_date.date(), end_date.date())
+            logger.warning("Try using dates within the last 7 days for best results")
+            return result
 
         # Cache base data
-        self.cache_data(df_base, base_interval)
+        self._write_frame(df_base, base_interval)
+
+        for tf in missing:
+            df = self._derive_timeframe(df_base, base_interval, tf)
+            if df is not None:
+                result[tf] = df
 
+        return result
+
+    def _read_cached(self, start_date, end_date, timeframe):
+        """
+        Read one timeframe from the cache
+
+        A COUNT on the primary key decides hit or miss before any rows
+        are materialized.
+
+        Args:
+            start_date: Start datetime
+            end_date: End datetime
+            timeframe: Timeframe string
+
+        Returns:
+            pandas DataFrame with cached data or None
+        """
+        if not Candle.count_range(start_date, end_date, timeframe):
+            return None
+        return self.get_cached_data(start_date, end_date, timeframe)
+
+    def _read_cached_in_worker(self, app, start_date, end_date, timeframe):
+        """_read_cached inside a worker thread, under its own app context"""
+        with app.app_context():
+            return self._read_cached(start_date, end_date, timeframe)
+
+    def _derive_timeframe(self, df_base, base_interval, timeframe):
+        """
+        Derive and cache a timeframe from already-fetched base data
+
+        Args:
+            df_base: DataFrame at the base interval
+            base_interval: Interval df_base was fetched at
+            timeframe: Target timeframe
+
+        Returns:
+            pandas DataFrame with OHLCV data or None
+        """
         # Resample to target timeframe if needed
         if timeframe == base_interval:
             return df_base
@@ -297,37 +589,16 @@ class DataFetcher:
         # Special handling for 3m timeframe
         if timeframe == '3m' and base_interval == '5m':
             # Can't accurately downsample from 5m to 3m, use 5m as substitute
-            print("Note: Using 5m data as substitute for 3m (historical data limitation)")
-            self.cache_data(df_base, '3m')  # Cache as 3m for consistency
+            logger.info("Using 5m data as substitute for 3m (historical data limitation)")
+            self._write_frame(df_base, '3m')  # Cache as 3m for consistency
             return df_base
 
         # For other conversions, try resampling
         df_resampled = self.resample_to_timeframe(df_base, timeframe)
         if df_resampled is not None:
-            self.cache_data(df_resampled, timeframe)
+            self._write_frame(df_resampled, timeframe)
         return df_resampled
 
-    def fetch_multiframe_data(self, start_date, end_date, timeframes=['4h', '1h', '3m']):
-        """
-        Fetch data for multiple timeframes
-
-        Args:
-            start_date: Start date
-            end_date: End date
-            timeframes: List of timeframe strings
-
-        Returns:
-            Dictionary mapping timeframe to DataFrame
-        """
-        result = {}
-
-        for tf in timeframes:
-            df = self.fetch_and_cache(start_date, end_date, timeframe=tf)
-            if df is not None:
-                result[tf] = df
-
-        return result
-
 
 # Convenience function
 def get_data_fetcher():
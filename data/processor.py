@@ -1,10 +1,58 @@
 """
 Data processor module - handles strategy-specific data filtering
 """
-import pandas as pd
-import pytz
-from datetime import datetime, time, timedelta
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 from config import Config
+from data.fetcher import DataFetcher
+
+# UTC is a fixed offset, so the stdlib singleton serves
+UTC = timezone.utc
+
+# Prepared replay frames kept per processor, keyed on (date, window, timeframes)
+REPLAY_CACHE_SIZE = 256
+
+# Day names indexed by date.weekday() / DatetimeIndex.dayofweek
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+@lru_cache(maxsize=256)
+def _valid_dates(start_date, end_date, valid_weekdays):
+    """
+    Valid trading dates in [start_date, end_date], memoized
+
+    Args:
+        start_date: Start date
+        end_date: End date
+        valid_weekdays: frozenset of date.weekday() values to keep
+
+    Returns:
+        Tuple of date objects
+    """
+    # Ordinal 1 (0001-01-01) is a Monday, so (ordinal - 1) % 7 == date.weekday()
+    return tuple(
+        date.fromordinal(ordinal)
+        for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1)
+        if (ordinal - 1) % 7 in valid_weekdays
+    )
+
+
+@lru_cache(maxsize=256)
+def _session_entries(start_date, end_date, valid_weekdays, time_window, time_window_label):
+    """Session info dicts for each valid date, memoized (callers copy them)"""
+    return tuple(
+        {
+            'date': day.isoformat(),
+            'date_formatted': day.strftime('%A, %B %d, %Y'),
+            'time_window': time_window,
+            'time_window_label': time_window_label,
+            'day_name': day.strftime('%A')
+        }
+        for day in _valid_dates(start_date, end_date, valid_weekdays)
+    )
 
 
 class DataProcessor:
@@ -12,9 +60,24 @@ class DataProcessor:
 
     def __init__(self):
         self.valid_days = Config.VALID_DAYS
+        self._valid_weekdays = frozenset(WEEKDAY_NAMES.index(day) for day in self.valid_days)
         self.time_windows = Config.TIME_WINDOWS
-        self.bst_tz = pytz.timezone(Config.DISPLAY_TIMEZONE)
-        self.utc_tz = pytz.timezone(Config.DATA_TIMEZONE)
+        self.bst_tz = ZoneInfo(Config.DISPLAY_TIMEZONE)
+        self.utc_tz = UTC if Config.DATA_TIMEZONE == 'UTC' else ZoneInfo(Config.DATA_TIMEZONE)
+
+        # One fetcher per processor; it shares the module-level HTTP session
+        self._fetcher = DataFetcher()
+
+        # LRU of complete, past-day replay data (see get_replay_data)
+        self._replay_cache = OrderedDict()
+        self._replay_lock = threading.Lock()
+
+        # Window start/end as minute-of-day integers for vectorized filtering
+        self._window_bounds = {
+            key: (window['start'].hour * 60 + window['start'].minute,
+                  window['end'].hour * 60 + window['end'].minute)
+            for key, window in self.time_windows.items()
+        }
 
     def filter_valid_trading_days(self, df):
         """
@@ -31,13 +94,9 @@ class DataProcessor:
         if df is None or df.empty:
             return df
 
-        # Get day names
-        df_copy = df.copy()
-        day_names = df_copy.index.day_name()
-
-        # Filter to valid days
-        mask = day_names.isin(self.valid_days)
-        filtered = df_copy[mask]
+        # Filter to valid days by integer weekday (no copy, no day-name strings)
+        mask = df.index.dayofweek.isin(self._valid_weekdays)
+        filtered = df[mask]
 
         print(f"Filtered to valid trading days: {len(filtered)} candles from {len(df)} total")
         return filtered
@@ -45,13 +104,13 @@ class DataProcessor:
     def convert_to_bst(self, dt):
         """Convert UTC datetime to BST"""
         if dt.tzinfo is None:
-            dt = self.utc_tz.localize(dt)
+            dt = dt.replace(tzinfo=self.utc_tz)
         return dt.astimezone(self.bst_tz)
 
     def convert_to_utc(self, dt):
         """Convert BST datetime to UTC"""
         if dt.tzinfo is None:
-            dt = self.bst_tz.localize(dt)
+            dt = dt.replace(tzinfo=self.bst_tz)
         return dt.astimezone(self.utc_tz)
 
     def filter_time_window(self, df, window_key):
@@ -73,20 +132,28 @@ class DataProcessor:
             return df
 
         window = self.time_windows[window_key]
-        start_time = window['start']
-        end_time = window['end']
+        start_minute, end_minute = self._window_bounds[window_key]
 
-        # Convert index to BST for filtering
-        df_copy = df.copy()
-        df_copy['bst_time'] = df_copy.index.map(lambda x: self.convert_to_bst(x).time())
+        # Convert index to BST wall-clock time once, then drop the zone so the
+        # hour/minute accessors take pandas' fast naive path
+        bst_index = df.index.tz_convert(self.bst_tz).tz_localize(None)
+        minute_of_day = bst_index.hour.values * 60 + bst_index.minute.values
 
         # Filter by time range
-        mask = (df_copy['bst_time'] >= start_time) & (df_copy['bst_time'] <= end_time)
-        filtered = df_copy[mask].drop(columns=['bst_time'])
+        mask = (minute_of_day >= start_minute) & (minute_of_day <= end_minute)
+        filtered = df[mask]
 
         print(f"Filtered to {window['label']}: {len(filtered)} candles")
         return filtered
 
+    def _to_date(self, value):
+        """Canonicalize a date, datetime or 'YYYY-MM-DD' string to a date"""
+        if isinstance(value, str):
+            return date.fromisoformat(value)
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
     def get_available_dates(self, start_date, end_date):
         """
         Get list of valid trading dates in range
@@ -98,27 +165,9 @@ class DataProcessor:
         Returns:
             List of date objects (valid trading days only)
         """
-        # Convert to datetime if string
-        if isinstance(start_date, str):
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-        elif isinstance(start_date, datetime):
-            start_date = start_date.date()
-
-        if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        elif isinstance(end_date, datetime):
-            end_date = end_date.date()
-
-        # Generate all dates in range
-        dates = []
-        current = start_date
-        while current <= end_date:
-            # Check if valid trading day
-            day_name = current.strftime('%A')
-            if day_name in self.valid_days:
-                dates.append(current)
-
-            current += timedelta(days=1)
+        start_date, end_date = self._to_date(start_date), self._to_date(end_date)
+
+        dates = list(_valid_dates(start_date, end_date, self._valid_weekdays))
 
         print(f"Found {len(dates)} valid trading dates between {start_date} and {end_date}")
         return dates
@@ -135,25 +184,16 @@ class DataProcessor:
         Returns:
             List of dictionaries with session info
         """
-        valid_dates = self.get_available_dates(start_date, end_date)
-
         if time_window not in self.time_windows:
             print(f"Invalid time window: {time_window}")
             return []
 
+        start_date, end_date = self._to_date(start_date), self._to_date(end_date)
         window_info = self.time_windows[time_window]
 
-        sessions = []
-        for date in valid_dates:
-            sessions.append({
-                'date': date.isoformat(),
-                'date_formatted': date.strftime('%A, %B %d, %Y'),
-                'time_window': time_window,
-                'time_window_label': window_info['label'],
-                'day_name': date.strftime('%A')
-            })
-
-        return sessions
+        entries = _session_entries(start_date, end_date, self._valid_weekdays,
+                                   time_window, window_info['label'])
+        return [dict(entry) for entry in entries]
 
     def prepare_replay_data(self, date, time_window, timeframes=['4h', '1h', '3m']):
         """
@@ -167,11 +207,10 @@ class DataProcessor:
         Returns:
             Dictionary with data for each timeframe
         """
-        from data.fetcher import DataFetcher
+        import pandas as pd
 
         # Convert date if needed
-        if isinstance(date, str):
-            date = datetime.strptime(date, '%Y-%m-%d').date()
+        date = self._to_date(date)
 
         # Calculate date range for context
         # For higher timeframes, we need data from before the specific date
@@ -182,18 +221,35 @@ class DataProcessor:
         context_start = datetime.combine(context_start_date, datetime.min.time())
         context_end = datetime.combine(context_end_date, datetime.min.time())
 
-        fetcher = DataFetcher()
         result = {}
 
+        # Window the cached 3m candles in SQL by precomputed minute of day;
+        # on a cache miss 3m is fetched with the rest and filtered below
+        if '3m' in timeframes and time_window in self._window_bounds:
+            day_start = datetime.combine(date, time.min, tzinfo=UTC)
+            day_last = day_start + timedelta(days=1) - timedelta(microseconds=1)
+            windowed = self._fetcher.get_cached_data(day_start, day_last, '3m',
+                                                     minute_range=self._window_bounds[time_window])
+            if windowed is not None:
+                result['3m'] = windowed
+                timeframes = [tf for tf in timeframes if tf != '3m']
+
+        # Cached timeframes are read concurrently; cold ones share one download
+        frames = self._fetcher.fetch_multiframe_data(context_start, context_end, timeframes)
+
         for tf in timeframes:
-            # Fetch data for timeframe
-            df = fetcher.fetch_and_cache(context_start, context_end, timeframe=tf)
+            df = frames.get(tf)
 
             if df is not None and not df.empty:
+                # Bounds of the (UTC) calendar day; the index is sorted, so
+                # .loc slices by binary search instead of per-row date objects
+                day_start = pd.Timestamp(date, tz=df.index.tz)
+                day_last = day_start + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+
                 # For 3-minute data, filter to specific date and time window
                 if tf == '3m':
                     # Filter to specific date
-                    df_date = df[df.index.date == date]
+                    df_date = df.loc[day_start:day_last]
 
                     # Filter to time window
                     df_filtered = self.filter_time_window(df_date, time_window)
@@ -201,11 +257,46 @@ class DataProcessor:
                     result[tf] = df_filtered
                 else:
                     # For higher timeframes (4h, 1h), include context up to the date
-                    df_filtered = df[df.index.date <= date]
+                    df_filtered = df.loc[:day_last]
                     result[tf] = df_filtered
 
         return result
 
+    def get_replay_data(self, date, time_window, timeframes=('4h', '1h', '3m')):
+        """
+        prepare_replay_data, memoized for repeated requests on the same scenario
+
+        Only complete results for days before today (UTC) are cached, so
+        failed fetches and still-forming sessions are retried. Returned
+        DataFrames are shared between callers and must be treated as read-only.
+
+        Args:
+            date: Date to prepare (datetime.date or string)
+            time_window: Time window key
+            timeframes: Sequence of timeframes to prepare
+
+        Returns:
+            Dictionary with data for each timeframe
+        """
+        date = self._to_date(date)
+        key = (date, time_window, tuple(timeframes))
+
+        with self._replay_lock:
+            if key in self._replay_cache:
+                self._replay_cache.move_to_end(key)
+                return self._replay_cache[key]
+
+        result = self.prepare_replay_data(date, time_window, timeframes=list(timeframes))
+
+        complete = all(result.get(tf) is not None and not result[tf].empty for tf in timeframes)
+        if complete and date < datetime.now(UTC).date():
+            with self._replay_lock:
+                self._replay_cache[key] = result
+                if len(self._replay_cache) > REPLAY_CACHE_SIZE:
+                    self._replay_cache.popitem(last=False)
+
+        return result
+
     def get_candles_for_date(self, date, time_window, timeframe='3m'):
         """
         Get candles for a specific date and time window
@@ -227,13 +318,9 @@ class DataProcessor:
 
     def is_valid_trading_day(self, date):
         """Check if a date is a valid trading day"""
-        if isinstance(date, str):
-            date = datetime.strptime(date, '%Y-%m-%d').date()
-        elif isinstance(date, datetime):
-            date = date.date()
+        date = self._to_date(date)
 
-        day_name = date.strftime('%A')
-        return day_name in self.valid_days
+        return date.weekday() in self._valid_weekdays
 
     def get_scenario_metadata(self, date, time_window):
         """
@@ -246,8 +333,7 @@ class DataProcessor:
         Returns:
             Dictionary with metadata
         """
-        if isinstance(date, str):
-            date = datetime.strptime(date, '%Y-%m-%d').date()
+        date = self._to_date(date)
 
         if not self.is_valid_trading_day(date):
             return None
@@ -268,6 +354,7 @@ class DataProcessor:
 
 
 # Convenience function
+@lru_cache(maxsize=None)
 def get_data_processor():
-    """Get a DataProcessor instance"""
+    """Get the shared DataProcessor instance (built once per process)"""
     return DataProcessor()
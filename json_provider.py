@@ -0,0 +1,38 @@
+"""
+Flask JSON provider backed by orjson
+"""
+import orjson
+from flask.json.provider import JSONProvider
+
+# numpy scalars/arrays are encoded natively; non-str dict keys are stringified;
+# naive datetimes are UTC throughout the app, so they are encoded with +00:00
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+
+def _default(obj):
+    """Fallback for types orjson does not encode natively"""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj):
+    """Encode obj to JSON bytes with the app-wide orjson options"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Encodes responses with orjson instead of the stdlib json module"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand the encoded bytes straight to the response, skipping decode
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype='application/json')
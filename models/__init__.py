@@ -1,10 +1,36 @@
 """
 Database models initialization
 """
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
+# Tuned for a read-heavy candle cache: WAL journal, relaxed fsync,
+# in-memory temp tables, 256 MB mmap and a 64 MB page cache
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+)
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLite pragmas once when a connection is opened"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
 def init_db(app):
     """Initialize database with Flask app"""
     db.init_app(app)
@@ -13,9 +39,17 @@ def init_db(app):
         # Import all models here to ensure they're registered
         from models import candle, session, trade
 
+        # Bring tables from older schema versions up to date
+        candle.Candle.migrate_schema()
+
         # Create tables
         db.create_all()
 
+        # create_all skips existing tables, so add any newly declared indexes
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+
         print("Database initialized successfully!")
 
 # Import models for easy access
@@ -1,9 +1,50 @@
 """
 Candle data model - stores historical price data
 """
-from datetime import datetime
+import calendar
+import numbers
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import BigInteger, Integer, TypeDecorator, inspect
+from config import Config
 from models import db
 
+EPOCH = datetime(1970, 1, 1)
+DISPLAY_TZ = ZoneInfo(Config.DISPLAY_TIMEZONE)
+
+
+def bst_minute_of_day(timestamp):
+    """Minute of the day in display time (BST/GMT) for a UTC timestamp"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    local = timestamp.astimezone(DISPLAY_TZ)
+    return local.hour * 60 + local.minute
+
+
+class EpochNanoseconds(TypeDecorator):
+    """
+    Stores datetimes as int64 UNIX nanoseconds (UTC)
+
+    Python code still sees naive UTC datetimes; SQL and bulk pandas paths
+    work with the raw integers, so reads need no string parsing.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return calendar.timegm(value.timetuple()) * 1_000_000_000 + value.microsecond * 1000
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return EPOCH + timedelta(microseconds=value // 1000)
+
 
 class Candle(db.Model):
     """
@@ -12,19 +53,24 @@ class Candle(db.Model):
     """
     __tablename__ = 'candles'
 
-    id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    timestamp = db.Column(EpochNanoseconds, nullable=False)  # UTC, ns since epoch
     open = db.Column(db.Float, nullable=False)
     high = db.Column(db.Float, nullable=False)
     low = db.Column(db.Float, nullable=False)
     close = db.Column(db.Float, nullable=False)
     volume = db.Column(db.Float, nullable=False)
-    timeframe = db.Column(db.String(10), nullable=False, index=True)  # '1m', '3m', '1h', '4h'
+    timeframe = db.Column(db.String(10), nullable=False)  # '1m', '3m', '1h', '4h'
+    bst_minute_of_day = db.Column(db.SmallInteger)  # Display-time minute of day, filled at ingest
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Composite index for efficient querying
+    # (timeframe, timestamp) is the clustered primary key, so range scans and
+    # INSERT OR IGNORE conflict checks are a single B-tree lookup
     __table_args__ = (
-        db.Index('idx_timeframe_timestamp', 'timeframe', 'timestamp'),
+        db.PrimaryKeyConstraint('timeframe', 'timestamp'),
+        db.Index('ix_candle_ts', 'timestamp'),
+        # Time-window reads: one timeframe, a minute-of-day band, a date range
+        db.Index('idx_tf_bstmod_ts', 'timeframe', 'bst_minute_of_day', 'timestamp'),
+        {'sqlite_with_rowid': False}
     )
 
     def __repr__(self):
@@ -43,31 +89,9 @@ class Candle(db.Model):
         }
 
     @classmethod
-    def from_series(cls, series, timeframe):
-        """
-        Create Candle instance from pandas Series
-
-        Args:
-            series: pandas Series with OHLCV data
-            timeframe: timeframe string (e.g., '1m', '3m')
-
-        Returns:
-            Candle instance
-        """
-        return cls(
-            timestamp=series.name.to_pydatetime() if hasattr(series.name, 'to_pydatetime') else series.name,
-            open=float(series['Open']),
-            high=float(series['High']),
-            low=float(series['Low']),
-            close=float(series['Close']),
-            volume=float(series['Volume']),
-            timeframe=timeframe
-        )
-
-    @classmethod
-    def get_range(cls, start_date, end_date, timeframe):
+    def count_range(cls, start_date, end_date, timeframe):
         """
-        Get candles for a date range and timeframe
+        Count cached candles in a range without loading them
 
         Args:
             start_date: Start datetime
@@ -75,35 +99,66 @@ class Candle(db.Model):
             timeframe: Timeframe string
 
         Returns:
-            List of Candle objects
+            Number of candles
         """
-        return cls.query.filter(
+        return db.session.query(db.func.count()).select_from(cls).filter(
             cls.timeframe == timeframe,
             cls.timestamp >= start_date,
             cls.timestamp <= end_date
-        ).order_by(cls.timestamp).all()
+        ).scalar()
 
     @classmethod
-    def exists(cls, timestamp, timeframe):
-        """Check if candle exists for given timestamp and timeframe"""
-        return cls.query.filter_by(
-            timestamp=timestamp,
-            timeframe=timeframe
-        ).first() is not None
-
-    @classmethod
-    def bulk_insert(cls, candles):
+    def migrate_schema(cls):
         """
-        Bulk insert candles efficiently
-
-        Args:
-            candles: List of Candle objects
+        Bring a legacy candles table up to the current schema, keeping
+        cached rows: rebuild it if it still has a surrogate id key or
+        text timestamps, add and backfill bst_minute_of_day if missing
         """
-        try:
-            db.session.bulk_save_objects(candles)
-            db.session.commit()
-            return True
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error bulk inserting candles: {e}")
-            return False
+        inspector = inspect(db.engine)
+        if not inspector.has_table(cls.__tablename__):
+            return
+
+        columns = {column['name']: column for column in inspector.get_columns(cls.__tablename__)}
+        legacy_key = 'id' in columns
+        text_timestamps = not isinstance(columns['timestamp']['type'], Integer)
+        missing_minute = 'bst_minute_of_day' not in columns
+        if not (legacy_key or text_timestamps or missing_minute):
+            return
+
+        with db.engine.begin() as conn:
+            if legacy_key or text_timestamps:
+                # Text timestamps are 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC
+                timestamp_sql = (
+                    "CAST(strftime('%s', timestamp) AS INTEGER) * 1000000000"
+                    " + CAST(substr(timestamp, 21, 6) AS INTEGER) * 1000"
+                ) if text_timestamps else 'timestamp'
+
+                legacy = f'{cls.__tablename__}_legacy'
+                copied = 'open, high, low, close, volume, timeframe, created_at'
+
+                conn.exec_driver_sql(f'ALTER TABLE {cls.__tablename__} RENAME TO {legacy}')
+                cls.__table__.create(bind=conn)
+                conn.exec_driver_sql(
+                    f'INSERT OR IGNORE INTO {cls.__tablename__} (timestamp, {copied}) '
+                    f'SELECT {timestamp_sql}, {copied} FROM {legacy}'
+                )
+                conn.exec_driver_sql(f'DROP TABLE {legacy}')
+            else:
+                conn.exec_driver_sql(
+                    f'ALTER TABLE {cls.__tablename__} ADD COLUMN bst_minute_of_day SMALLINT'
+                )
+
+            # Backfill the precomputed display-time minute for existing rows
+            rows = conn.exec_driver_sql(
+                f'SELECT timeframe, timestamp FROM {cls.__tablename__} WHERE bst_minute_of_day IS NULL'
+            ).all()
+            if rows:
+                conn.exec_driver_sql(
+                    f'UPDATE {cls.__tablename__} SET bst_minute_of_day = ? WHERE timeframe = ? AND timestamp = ?',
+                    [
+                        (bst_minute_of_day(EPOCH + timedelta(microseconds=ts // 1000)), timeframe, ts)
+                        for timeframe, ts in rows
+                    ]
+                )
+
+        print("Migrated candles table to the current schema")
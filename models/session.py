@@ -3,7 +3,6 @@ Session model - stores practice session information
 """
 from datetime import datetime
 from models import db
-import json
 
 
 class Session(db.Model):
@@ -22,11 +21,12 @@ class Session(db.Model):
     date_range_end = db.Column(db.Date, nullable=False)
     time_window = db.Column(db.String(20), nullable=False)  # 'morning_1', 'morning_2', etc.
 
-    # Playlist of dates (stored as JSON array)
-    playlist_json = db.Column(db.Text, nullable=False)  # ["2024-11-04", "2024-11-08", ...]
+    # Playlist of dates, (de)serialized by the JSON column type; the database
+    # column keeps its original name so existing rows load unchanged
+    playlist = db.Column('playlist_json', db.JSON, nullable=False)  # ["2024-11-04", "2024-11-08", ...]
     current_date_index = db.Column(db.Integer, default=0)  # Current position in playlist
 
-    # Session statistics
+    # Session statistics (denormalized cache, see refresh_statistics)
     total_trades = db.Column(db.Integer, default=0)
     winning_trades = db.Column(db.Integer, default=0)
     losing_trades = db.Column(db.Integer, default=0)
@@ -37,25 +37,18 @@ class Session(db.Model):
     is_completed = db.Column(db.Boolean, default=False)
 
     # Relationship to trades
-    trades = db.relationship('Trade', backref='session', lazy='dynamic', cascade='all, delete-orphan')
+    # Loaded as a list in one query (eager-load with joinedload where needed);
+    # ordered like every trade listing in the app
+    trades = db.relationship('Trade', backref='session', order_by='Trade.created_at',
+                             cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Session {self.id} {self.time_window} {self.date_range_start} to {self.date_range_end}>'
 
-    @property
-    def playlist(self):
-        """Get playlist as Python list"""
-        return json.loads(self.playlist_json) if self.playlist_json else []
-
-    @playlist.setter
-    def playlist(self, dates_list):
-        """Set playlist from Python list"""
-        self.playlist_json = json.dumps(dates_list)
-
     @property
     def current_date(self):
         """Get current date from playlist"""
-        playlist = self.playlist
+        playlist = self.playlist or []
         if 0 <= self.current_date_index < len(playlist):
             return playlist[self.current_date_index]
         return None
@@ -77,14 +70,14 @@ class Session(db.Model):
     @property
     def progress_percentage(self):
         """Calculate session progress percentage"""
-        playlist = self.playlist
+        playlist = self.playlist or []
         if not playlist:
             return 0.0
         return (self.current_date_index / len(playlist)) * 100
 
     def advance_to_next_date(self):
         """Move to next date in playlist"""
-        playlist = self.playlist
+        playlist = self.playlist or []
         if self.current_date_index < len(playlist) - 1:
             self.current_date_index += 1
             return True
@@ -92,23 +85,43 @@ class Session(db.Model):
             self.is_completed = True
             return False
 
-    def update_statistics(self, trade):
+    @classmethod
+    def compute_stats(cls, session_id):
         """
-        Update session statistics after a trade
+        Aggregate a session's resolved trades in one GROUP BY query
 
         Args:
-            trade: Trade object
+            session_id: Session ID
+
+        Returns:
+            dict with total/winning/losing/scratch trade counts and total_pnl
         """
-        self.total_trades += 1
+        from models.trade import Trade
 
-        if trade.outcome == 'win':
-            self.winning_trades += 1
-        elif trade.outcome == 'loss':
-            self.losing_trades += 1
-        elif trade.outcome == 'scratch':
-            self.scratch_trades += 1
+        rows = db.session.execute(
+            db.select(Trade.outcome, db.func.count(), db.func.sum(Trade.pnl_points))
+            .where(Trade.session_id == session_id, Trade.outcome.isnot(None))
+            .group_by(Trade.outcome)
+        ).all()
+        counts = {outcome: count for outcome, count, _ in rows}
 
-        self.total_pnl += trade.pnl_points
+        return {
+            'total_trades': sum(counts.values()),
+            'winning_trades': counts.get('win', 0),
+            'losing_trades': counts.get('loss', 0),
+            'scratch_trades': counts.get('scratch', 0),
+            'total_pnl': sum(pnl or 0.0 for _, _, pnl in rows)
+        }
+
+    def refresh_statistics(self):
+        """
+        Recompute the denormalized statistics columns from the trades table
+
+        Counters are derived from SQL rather than incremented, so resolving
+        the same trade twice cannot make them drift.
+        """
+        for name, value in self.compute_stats(self.id).items():
+            setattr(self, name, value)
         self.updated_at = datetime.utcnow()
 
     def to_dict(self):
@@ -119,17 +132,17 @@ class Session(db.Model):
             'date_range_start': self.date_range_start.isoformat(),
             'date_range_end': self.date_range_end.isoformat(),
             'time_window': self.time_window,
-            'playlist': self.playlist,
+            'playlist': self.playlist or [],
             'current_date_index': self.current_date_index,
             'current_date': self.current_date,
             'total_trades': self.total_trades,
             'winning_trades': self.winning_trades,
             'losing_trades': self.losing_trades,
             'scratch_trades': self.scratch_trades,
-            'win_rate': round(self.win_rate, 2),
-            'total_pnl': round(self.total_pnl, 2),
-            'average_pnl': round(self.average_pnl, 2),
-            'progress_percentage': round(self.progress_percentage, 2),
+            'win_rate': self.win_rate,
+            'total_pnl': self.total_pnl,
+            'average_pnl': self.average_pnl,
+            'progress_percentage': self.progress_percentage,
             'is_completed': self.is_completed
         }
 
@@ -147,10 +160,9 @@ class Session(db.Model):
         Returns:
             Session instance
         """
-        session = cls(
+        return cls(
             date_range_start=date_range_start,
             date_range_end=date_range_end,
-            time_window=time_window
+            time_window=time_window,
+            playlist=list(dates_list)
         )
-        session.playlist = dates_list
-        return session
@@ -2,9 +2,13 @@
 Trade model - stores individual trade records
 """
 from datetime import datetime
+from sqlalchemy import orm
 from models import db
 import json
 
+# Marks the parsed-annotations cache as not yet filled
+_UNPARSED = object()
+
 
 class Trade(db.Model):
     """
@@ -40,18 +44,37 @@ class Trade(db.Model):
     # Chart annotations (drawings, labels, etc.)
     annotations_json = db.Column(db.Text)  # Stored as JSON
 
+    # Composite indexes for per-session lookups: creation order (trade
+    # listings, Session.trades) and outcome/direction breakdowns (stats)
+    __table_args__ = (
+        db.Index('ix_trade_session_created', 'session_id', 'created_at'),
+        db.Index('ix_trade_session_outcome_dir', 'session_id', 'outcome', 'direction'),
+    )
+
+    def __init__(self, **kwargs):
+        self._annotations_cache = _UNPARSED
+        super().__init__(**kwargs)
+
+    @orm.reconstructor
+    def _init_on_load(self):
+        """Reset the annotations cache for instances loaded from the database"""
+        self._annotations_cache = _UNPARSED
+
     def __repr__(self):
         return f'<Trade {self.id} {self.direction} @ {self.entry_price} - {self.outcome}>'
 
     @property
     def annotations(self):
-        """Get annotations as Python object"""
-        return json.loads(self.annotations_json) if self.annotations_json else {}
+        """Get annotations as Python object (parsed once per instance)"""
+        if self._annotations_cache is _UNPARSED:
+            self._annotations_cache = json.loads(self.annotations_json) if self.annotations_json else {}
+        return self._annotations_cache
 
     @annotations.setter
     def annotations(self, data):
         """Set annotations from Python object"""
         self.annotations_json = json.dumps(data) if data else None
+        self._annotations_cache = data if data else {}
 
     @property
     def duration_minutes(self):
@@ -98,71 +121,85 @@ class Trade(db.Model):
         Returns:
             dict with outcome details
         """
-        for candle in candles:
-            if self.direction == 'long':
-                # Check if SL hit
-                if candle.low <= self.stop_loss:
-                    self.outcome = 'loss'
-                    self.exit_price = self.stop_loss
-                    self.exit_timestamp = candle.timestamp
-                    self.pnl_points = self.exit_price - self.entry_price
-                    self.pnl_percentage = (self.pnl_points / (self.entry_price - self.stop_loss)) * 100
-                    return {
-                        'outcome': 'loss',
-                        'exit_price': self.exit_price,
-                        'exit_timestamp': self.exit_timestamp.isoformat(),
-                        'pnl_points': round(self.pnl_points, 2)
-                    }
-
-                # Check if TP hit
-                if candle.high >= self.take_profit:
-                    self.outcome = 'win'
-                    self.exit_price = self.take_profit
-                    self.exit_timestamp = candle.timestamp
-                    self.pnl_points = self.exit_price - self.entry_price
-                    self.pnl_percentage = (self.pnl_points / (self.entry_price - self.stop_loss)) * 100
-                    return {
-                        'outcome': 'win',
-                        'exit_price': self.exit_price,
-                        'exit_timestamp': self.exit_timestamp.isoformat(),
-                        'pnl_points': round(self.pnl_points, 2)
-                    }
-
-            elif self.direction == 'short':
-                # Check if SL hit
-                if candle.high >= self.stop_loss:
-                    self.outcome = 'loss'
-                    self.exit_price = self.stop_loss
-                    self.exit_timestamp = candle.timestamp
-                    self.pnl_points = self.entry_price - self.exit_price
-                    self.pnl_percentage = (self.pnl_points / (self.stop_loss - self.entry_price)) * 100
-                    return {
-                        'outcome': 'loss',
-                        'exit_price': self.exit_price,
-                        'exit_timestamp': self.exit_timestamp.isoformat(),
-                        'pnl_points': round(self.pnl_points, 2)
-                    }
-
-                # Check if TP hit
-                if candle.low <= self.take_profit:
-                    self.outcome = 'win'
-                    self.exit_price = self.take_profit
-                    self.exit_timestamp = candle.timestamp
-                    self.pnl_points = self.entry_price - self.exit_price
-                    self.pnl_percentage = (self.pnl_points / (self.stop_loss - self.entry_price)) * 100
-                    return {
-                        'outcome': 'win',
-                        'exit_price': self.exit_price,
-                        'exit_timestamp': self.exit_timestamp.isoformat(),
-                        'pnl_points': round(self.pnl_points, 2)
-                    }
+        import numpy as np
+
+        count = len(candles)
+        highs = np.fromiter((candle.high for candle in candles), dtype='f8', count=count)
+        lows = np.fromiter((candle.low for candle in candles), dtype='f8', count=count)
+        timestamps = [candle.timestamp for candle in candles]
+
+        return self.determine_outcome_arrays(highs, lows, timestamps)
+
+    def determine_outcome_arrays(self, highs, lows, timestamps):
+        """
+        Determine trade outcome from candle arrays in a single scan
+
+        The first candle touching SL or TP decides the trade; when a single
+        candle touches both, the SL is assumed to have been hit first.
+
+        Args:
+            highs: NumPy array of candle highs after entry
+            lows: NumPy array of candle lows after entry
+            timestamps: Sequence of candle timestamps aligned with highs/lows
+
+        Returns:
+            dict with outcome details
+        """
+        import numpy as np
+        from scoring import scan_outcome
+
+        if self.direction not in ('long', 'short'):
+            return {'outcome': 'pending'}
+
+        # One array layout/dtype keeps the compiled kernel to one signature
+        highs = np.ascontiguousarray(highs, dtype='f8')
+        lows = np.ascontiguousarray(lows, dtype='f8')
+
+        exit_index, is_loss = scan_outcome(highs, lows, float(self.stop_loss),
+                                           float(self.take_profit), self.direction == 'long')
 
         # No outcome yet - trade still open
-        return {'outcome': 'pending'}
+        if exit_index < 0:
+            return {'outcome': 'pending'}
+
+        if is_loss:
+            outcome, exit_price = 'loss', self.stop_loss
+        else:
+            outcome, exit_price = 'win', self.take_profit
+
+        exit_timestamp = timestamps[exit_index]
+        if hasattr(exit_timestamp, 'to_pydatetime'):
+            exit_timestamp = exit_timestamp.to_pydatetime()
+
+        self.outcome = outcome
+        self.exit_price = exit_price
+        self.exit_timestamp = exit_timestamp
+
+        if self.direction == 'long':
+            self.pnl_points = self.exit_price - self.entry_price
+            self.pnl_percentage = (self.pnl_points / (self.entry_price - self.stop_loss)) * 100
+        else:
+            self.pnl_points = self.entry_price - self.exit_price
+            self.pnl_percentage = (self.pnl_points / (self.stop_loss - self.entry_price)) * 100
 
-    def to_dict(self):
-        """Convert trade to dictionary"""
         return {
+            'outcome': outcome,
+            'exit_price': self.exit_price,
+            'exit_timestamp': self.exit_timestamp.isoformat(),
+            'pnl_points': round(self.pnl_points, 2)
+        }
+
+    def to_dict(self, include_annotations=False):
+        """
+        Convert trade to dictionary
+
+        Args:
+            include_annotations: Also parse and include chart annotations
+
+        Returns:
+            Dictionary of trade fields
+        """
+        data = {
             'id': self.id,
             'session_id': self.session_id,
             'entry_timestamp': self.entry_timestamp.isoformat(),
@@ -173,14 +210,16 @@ class Trade(db.Model):
             'take_profit': self.take_profit,
             'exit_price': self.exit_price,
             'outcome': self.outcome,
-            'pnl_points': round(self.pnl_points, 2),
-            'pnl_percentage': round(self.pnl_percentage, 2),
+            'pnl_points': self.pnl_points,
+            'pnl_percentage': self.pnl_percentage,
             'duration_minutes': self.duration_minutes,
-            'risk_reward_ratio': round(self.risk_reward_ratio, 2) if self.risk_reward_ratio else None,
+            'risk_reward_ratio': self.risk_reward_ratio or None,
             'is_a_grade': self.is_a_grade,
-            'notes': self.notes,
-            'annotations': self.annotations
+            'notes': self.notes
         }
+        if include_annotations:
+            data['annotations'] = self.annotations
+        return data
 
     @classmethod
     def create_trade(cls, session_id, timestamp, direction, entry_price, stop_loss_points, risk_reward_ratio, notes=None, annotations=None):
@@ -1,7 +1,20 @@
 """
 Routes package initialization
 """
-from routes.api import api_bp
-from routes.views import views_bp
+import importlib
+
+# Blueprints are resolved on first access so importing one routes module
+# does not pull in the other (and its data-layer dependencies)
+_BLUEPRINT_MODULES = {
+    'api_bp': 'routes.api',
+    'views_bp': 'routes.views',
+}
+
+
+def __getattr__(name):
+    if name in _BLUEPRINT_MODULES:
+        return getattr(importlib.import_module(_BLUEPRINT_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['api_bp', 'views_bp']
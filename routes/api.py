@@ -1,18 +1,189 @@
 """
 API routes for German30 Trading Simulator
 """
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, Response, request, jsonify
+from datetime import date, datetime, timezone
 from config import Config
+from json_provider import dumps_bytes
 from models import db
 from models.session import Session
 from models.trade import Trade
-from models.candle import Candle
-from data.processor import DataProcessor
-from data.fetcher import DataFetcher
+from data.processor import get_data_processor
 
 api_bp = Blueprint('api', __name__)
 
+# Request validation sets, built once at import
+TIME_WINDOW_KEYS = frozenset(Config.TIME_WINDOWS)
+TRADE_DIRECTIONS = frozenset(('long', 'short'))
+
+# Trades returned in a session's stats 'recent_trades'
+RECENT_TRADES_LIMIT = 10
+
+# Candles serialized per chunk of a streamed get_candles response
+CANDLE_STREAM_CHUNK = 2048
+
+# Constant responses, serialized once at import
+TIME_WINDOWS_PAYLOAD = dumps_bytes({
+    'success': True,
+    'time_windows': [
+        {'key': key, **window} for key, window in Config.TIME_WINDOWS_SERIALIZABLE.items()
+    ]
+})
+HEALTH_PAYLOAD = dumps_bytes({
+    'status': 'healthy',
+    'service': 'German30 Trading Simulator',
+    'version': '1.0.0'
+})
+
+
+def _candle_records(df):
+    """Convert an OHLCV DataFrame to candle dicts, one column array at a time"""
+    index = df.index.tz_localize('UTC') if df.index.tz is None else df.index.tz_convert('UTC')
+    times = (index.asi8 // 1_000_000_000).tolist()
+    stamps = index.strftime('%Y-%m-%dT%H:%M:%S+00:00').tolist()
+    opens, highs, lows, closes, volumes = (
+        df[col].to_numpy(dtype='float64').tolist() for col in ('Open', 'High', 'Low', 'Close', 'Volume')
+    )
+
+    return [
+        {
+            'time': time,
+            'timestamp': stamp,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume
+        }
+        for time, stamp, open_, high, low, close, volume
+        in zip(times, stamps, opens, highs, lows, closes, volumes)
+    ]
+
+
+def _candle_columns(df):
+    """Candle fields of an OHLCV DataFrame as parallel NumPy arrays"""
+    index = df.index.tz_localize('UTC') if df.index.tz is None else df.index.tz_convert('UTC')
+    return {
+        'time': index.asi8 // 1_000_000_000,
+        'timestamp': index.strftime('%Y-%m-%dT%H:%M:%S+00:00').tolist(),
+        'open': df['Open'].to_numpy(dtype='float64'),
+        'high': df['High'].to_numpy(dtype='float64'),
+        'low': df['Low'].to_numpy(dtype='float64'),
+        'close': df['Close'].to_numpy(dtype='float64'),
+        'volume': df['Volume'].to_numpy(dtype='float64')
+    }
+
+
+def _stream_candles(df, timeframe, chunk_size=CANDLE_STREAM_CHUNK):
+    """
+    Yield the get_candles JSON payload in chunks
+
+    Args:
+        df: OHLCV DataFrame to serialize
+        timeframe: Timeframe string echoed in the payload
+        chunk_size: Candles encoded per yielded chunk
+
+    Yields:
+        JSON byte strings that concatenate to one object
+    """
+    yield b'{"success":true,"candles":['
+    for start in range(0, len(df), chunk_size):
+        if start:
+            yield b','
+        # Encode the chunk as a list and drop its brackets to splice it in
+        yield dumps_bytes(_candle_records(df.iloc[start:start + chunk_size]))[1:-1]
+    yield b'],"total":' + dumps_bytes(len(df)) + b',"timeframe":' + dumps_bytes(timeframe) + b'}'
+
+
+def _parse_iso_date(value):
+    """Parse a date string in canonical YYYY-MM-DD form, or None if it isn't one"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.isoformat() == value else None
+
+
+def _parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC
+
+    datetime.fromisoformat only understands 'Z' natively from Python 3.11,
+    so the suffix is rewritten for older interpreters.
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+def _build_trade(data):
+    """
+    Validate a trade-entry payload and build the (unsaved) Trade
+
+    Args:
+        data: Dictionary with the /trade/enter fields
+
+    Returns:
+        (Trade, None) on success, (None, error message) on invalid input
+    """
+    if not isinstance(data, dict):
+        return None, 'trade must be an object'
+
+    session_id = data.get('session_id')
+    timestamp_str = data.get('timestamp')
+    direction = data.get('direction')
+    entry_price = data.get('entry_price')
+
+    # Validation
+    if not all([session_id, timestamp_str, direction, entry_price]):
+        return None, 'session_id, timestamp, direction, and entry_price required'
+
+    if direction not in TRADE_DIRECTIONS:
+        return None, 'direction must be "long" or "short"'
+
+    # Coerce like db.session.get does, so "1" and 1 name the same session
+    try:
+        session_id = int(session_id)
+    except (TypeError, ValueError):
+        return None, f'session_id must be an integer: {session_id!r}'
+
+    try:
+        timestamp = _parse_timestamp(timestamp_str)
+    except (TypeError, ValueError, AttributeError):
+        return None, f'timestamp must be an ISO 8601 string: {timestamp_str!r}'
+
+    try:
+        entry_price = float(entry_price)
+    except (TypeError, ValueError):
+        return None, f'entry_price must be a number: {entry_price!r}'
+
+    is_a_grade = data.get('is_a_grade', False)
+    if not isinstance(is_a_grade, bool):
+        return None, f'is_a_grade must be a boolean: {is_a_grade!r}'
+
+    # Create trade
+    trade = Trade.create_trade(
+        session_id=session_id,
+        timestamp=timestamp,
+        direction=direction,
+        entry_price=entry_price,
+        stop_loss_points=Config.STOP_LOSS_POINTS,
+        risk_reward_ratio=Config.RISK_REWARD_RATIO,
+        notes=data.get('notes'),
+        annotations=data.get('annotations')
+    )
+
+    trade.is_a_grade = is_a_grade
+
+    return trade, None
+
+
+def _count_where(condition):
+    """SQL expression counting the rows that match a condition"""
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
 
 @api_bp.route('/available-dates', methods=['GET'])
 def get_available_dates():
@@ -35,7 +206,7 @@ def get_available_dates():
         if not start_date or not end_date:
             return jsonify({'error': 'start_date and end_date required'}), 400
 
-        processor = DataProcessor()
+        processor = get_data_processor()
 
         if time_window:
             sessions = processor.get_available_sessions(start_date, end_date, time_window)
@@ -72,7 +243,7 @@ def start_session():
         Session object with ID
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=True)
 
         dates = data.get('dates', [])
         time_window = data.get('time_window')
@@ -80,7 +251,7 @@ def start_session():
         if not dates or not time_window:
             return jsonify({'error': 'dates and time_window required'}), 400
 
-        if time_window not in Config.TIME_WINDOWS:
+        if time_window not in TIME_WINDOW_KEYS:
             return jsonify({'error': f'Invalid time_window: {time_window}'}), 400
 
         if len(dates) > Config.MAX_DATES_PER_SESSION:
@@ -88,10 +259,20 @@ def start_session():
                 'error': f'Maximum {Config.MAX_DATES_PER_SESSION} dates allowed per session'
             }), 400
 
-        # Determine date range
-        date_objs = [datetime.strptime(d, '%Y-%m-%d').date() for d in dates]
-        date_range_start = min(date_objs)
-        date_range_end = max(date_objs)
+        # Every entry must be a canonical YYYY-MM-DD string, since the
+        # playlist stores them as-is and scenarios parse them on load
+        parsed_dates = []
+        for position, value in enumerate(dates):
+            parsed = _parse_iso_date(value)
+            if parsed is None:
+                return jsonify({
+                    'error': f'Invalid date at index {position}: {value!r} (expected YYYY-MM-DD)'
+                }), 400
+            parsed_dates.append(parsed)
+
+        # Determine date range from the already-parsed dates
+        date_range_start = min(parsed_dates)
+        date_range_end = max(parsed_dates)
 
         # Create session
         session = Session.create_session(
@@ -118,7 +299,7 @@ def start_session():
 def get_session(session_id):
     """Get session details"""
     try:
-        session = Session.query.get(session_id)
+        session = db.session.get(Session, session_id)
 
         if not session:
             return jsonify({'error': 'Session not found'}), 404
@@ -141,7 +322,7 @@ def next_scenario(session_id):
         Next scenario metadata
     """
     try:
-        session = Session.query.get(session_id)
+        session = db.session.get(Session, session_id)
 
         if not session:
             return jsonify({'error': 'Session not found'}), 404
@@ -159,7 +340,7 @@ def next_scenario(session_id):
             })
 
         # Get metadata for new current date
-        processor = DataProcessor()
+        processor = get_data_processor()
         metadata = processor.get_scenario_metadata(session.current_date, session.time_window)
 
         return jsonify({
@@ -185,6 +366,7 @@ def get_candles():
         - time_window: Time window key
         - timeframe: Timeframe ('3m', '1h', '4h')
         - limit: Number of candles to reveal (optional)
+        - format: 'columns' for parallel arrays instead of candle objects (optional)
 
     Returns:
         Candle data array
@@ -199,12 +381,11 @@ def get_candles():
         if not date_str or not time_window:
             return jsonify({'error': 'date and time_window required'}), 400
 
-        processor = DataProcessor()
-        fetcher = DataFetcher()
+        processor = get_data_processor()
 
         # Prepare data for this scenario
-        date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        multiframe_data = processor.prepare_replay_data(date, time_window, timeframes=[timeframe])
+        replay_date = date.fromisoformat(date_str)
+        multiframe_data = processor.get_replay_data(replay_date, time_window, timeframes=[timeframe])
 
         df = multiframe_data.get(timeframe)
 
@@ -215,29 +396,21 @@ def get_candles():
                 'total': 0
             })
 
-        # Convert to dictionary format
-        candles = []
-        for timestamp, row in df.iterrows():
-            candles.append({
-                'time': int(timestamp.timestamp()),
-                'timestamp': timestamp.isoformat(),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': float(row['Volume'])
-            })
-
-        # Apply limit if specified
+        # Apply limit if specified, before any conversion work
         if limit and limit > 0:
-            candles = candles[:limit]
+            df = df.iloc[:limit]
 
-        return jsonify({
-            'success': True,
-            'candles': candles,
-            'total': len(candles),
-            'timeframe': timeframe
-        })
+        # Columnar form: numpy arrays go straight to orjson, no per-value casts
+        if request.args.get('format') == 'columns':
+            return jsonify({
+                'success': True,
+                'columns': _candle_columns(df),
+                'total': len(df),
+                'timeframe': timeframe
+            })
+
+        # Stream the payload chunk by chunk instead of building every dict first
+        return Response(_stream_candles(df, timeframe), mimetype='application/json')
 
     except Exception as e:
         import traceback
@@ -264,53 +437,79 @@ def enter_trade():
         Trade object with calculated SL/TP
     """
     try:
-        data = request.get_json()
-
-        session_id = data.get('session_id')
-        timestamp_str = data.get('timestamp')
-        direction = data.get('direction')
-        entry_price = data.get('entry_price')
-        notes = data.get('notes')
-        annotations = data.get('annotations')
-        is_a_grade = data.get('is_a_grade', False)
-
-        # Validation
-        if not all([session_id, timestamp_str, direction, entry_price]):
-            return jsonify({
-                'error': 'session_id, timestamp, direction, and entry_price required'
-            }), 400
+        data = request.get_json(cache=True)
 
-        if direction not in ['long', 'short']:
-            return jsonify({'error': 'direction must be "long" or "short"'}), 400
+        trade, error = _build_trade(data)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Verify session exists
-        session = Session.query.get(session_id)
+        session = db.session.get(Session, trade.session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Parse timestamp
-        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-
-        # Create trade
-        trade = Trade.create_trade(
-            session_id=session_id,
-            timestamp=timestamp,
-            direction=direction,
-            entry_price=float(entry_price),
-            stop_loss_points=Config.STOP_LOSS_POINTS,
-            risk_reward_ratio=Config.RISK_REWARD_RATIO,
-            notes=notes,
-            annotations=annotations
-        )
+        db.session.add(trade)
+        db.session.commit()
 
-        trade.is_a_grade = is_a_grade
+        return jsonify({
+            'success': True,
+            'trade': trade.to_dict(include_annotations=True)
+        }), 201
 
-        db.session.add(trade)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/trade/enter/bulk', methods=['POST'])
+def enter_trades_bulk():
+    """
+    Enter a batch of trades in one transaction
+
+    JSON body:
+        - Array of trade objects, each with the /trade/enter fields
+          (or an object with a 'trades' array)
+
+    Returns:
+        Created trade objects, in request order
+    """
+    try:
+        data = request.get_json(cache=True)
+        rows = data.get('trades') if isinstance(data, dict) else data
+
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'non-empty array of trades required'}), 400
+
+        # Validate every row before writing anything
+        trades, errors = [], []
+        for position, row in enumerate(rows):
+            trade, error = _build_trade(row)
+            if error:
+                errors.append({'index': position, 'error': error})
+            else:
+                trades.append(trade)
+
+        if errors:
+            return jsonify({'error': 'invalid trades', 'details': errors}), 400
+
+        # Verify all referenced sessions exist in one query
+        session_ids = {trade.session_id for trade in trades}
+        found = {session_id for (session_id,) in
+                 db.session.query(Session.id).filter(Session.id.in_(session_ids))}
+        if found != session_ids:
+            return jsonify({
+                'error': 'Session not found',
+                'session_ids': sorted(session_ids - found)
+            }), 404
+
+        # One flush (batched executemany INSERT) and one commit for the batch
+        db.session.add_all(trades)
         db.session.commit()
 
         return jsonify({
             'success': True,
-            'trade': trade.to_dict()
+            'trades': [trade.to_dict(include_annotations=True) for trade in trades],
+            'total': len(trades)
         }), 201
 
     except Exception as e:
@@ -331,7 +530,8 @@ def get_trade_outcome(trade_id):
         Trade outcome with exit details
     """
     try:
-        trade = Trade.query.get(trade_id)
+        # The parent session is needed for the statistics refresh below
+        trade = db.session.get(Trade, trade_id, options=[db.joinedload(Trade.session)])
 
         if not trade:
             return jsonify({'error': 'Trade not found'}), 404
@@ -340,7 +540,7 @@ def get_trade_outcome(trade_id):
         if trade.outcome:
             return jsonify({
                 'success': True,
-                'trade': trade.to_dict()
+                'trade': trade.to_dict(include_annotations=True)
             })
 
         # Get required params
@@ -351,49 +551,46 @@ def get_trade_outcome(trade_id):
             return jsonify({'error': 'date and time_window required'}), 400
 
         # Get candles after entry
-        processor = DataProcessor()
-        date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        processor = get_data_processor()
+        trade_date = date.fromisoformat(date_str)
 
-        multiframe_data = processor.prepare_replay_data(date, time_window, timeframes=['3m'])
+        multiframe_data = processor.get_replay_data(trade_date, time_window, timeframes=['3m'])
         df = multiframe_data.get('3m')
 
         if df is None or df.empty:
             return jsonify({'error': 'No candle data available'}), 404
 
-        # Filter candles after entry timestamp
-        candles_after = []
-        for timestamp, row in df.iterrows():
-            # Ensure trade.entry_timestamp is timezone-aware for comparison
-            entry_ts = trade.entry_timestamp
-            if entry_ts.tzinfo is None:
-                import pytz
-                entry_ts = pytz.UTC.localize(entry_ts)
-
-            if timestamp > entry_ts:
-                candle = Candle.from_series(row, '3m')
-                candle.timestamp = timestamp.to_pydatetime() if hasattr(timestamp, 'to_pydatetime') else timestamp
-                candles_after.append(candle)
-
-        if not candles_after:
+        # Ensure trade.entry_timestamp is timezone-aware for comparison
+        entry_ts = trade.entry_timestamp
+        if entry_ts.tzinfo is None:
+            entry_ts = entry_ts.replace(tzinfo=timezone.utc)
+
+        # Filter candles after entry timestamp with one vectorized comparison
+        candles_after = df[df.index > entry_ts]
+
+        if candles_after.empty:
             return jsonify({
                 'success': True,
                 'outcome': 'pending',
                 'message': 'Trade still open - no subsequent candles'
             })
 
-        # Determine outcome
-        outcome_result = trade.determine_outcome(candles_after)
+        # Determine outcome straight from the column arrays
+        outcome_result = trade.determine_outcome_arrays(
+            candles_after['High'].to_numpy(dtype='float64'),
+            candles_after['Low'].to_numpy(dtype='float64'),
+            candles_after.index
+        )
 
         # Update session statistics if outcome determined
         if trade.outcome:
-            session = trade.session
-            session.update_statistics(trade)
+            trade.session.refresh_statistics()
 
         db.session.commit()
 
         return jsonify({
             'success': True,
-            'trade': trade.to_dict(),
+            'trade': trade.to_dict(include_annotations=True),
             'outcome_details': outcome_result
         })
 
@@ -411,57 +608,64 @@ def get_session_stats(session_id):
         Session stats with trade details
     """
     try:
-        session = Session.query.get(session_id)
+        session = db.session.get(Session, session_id)
 
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Get all trades for this session
-        trades = Trade.query.filter_by(session_id=session_id).order_by(Trade.created_at).all()
-
-        # Calculate additional stats
-        trades_by_outcome = {
-            'win': [t for t in trades if t.outcome == 'win'],
-            'loss': [t for t in trades if t.outcome == 'loss'],
-            'scratch': [t for t in trades if t.outcome == 'scratch']
-        }
-
-        # Win/loss by direction
-        long_trades = [t for t in trades if t.direction == 'long']
-        short_trades = [t for t in trades if t.direction == 'short']
-
-        # A-grade setups
-        a_grade_trades = [t for t in trades if t.is_a_grade]
-        a_grade_wins = [t for t in a_grade_trades if t.outcome == 'win']
+        is_win = Trade.outcome == 'win'
+
+        # Counts, direction/A-grade breakdowns and best/worst in one pass;
+        # labelled so the result row is read by name, not position
+        totals = db.session.query(
+            db.func.count(Trade.id).label('total_trades'),
+            _count_where(is_win).label('wins'),
+            _count_where(Trade.outcome == 'loss').label('losses'),
+            _count_where(Trade.outcome == 'scratch').label('scratches'),
+            _count_where(Trade.direction == 'long').label('long_count'),
+            _count_where((Trade.direction == 'long') & is_win).label('long_wins'),
+            _count_where(Trade.direction == 'short').label('short_count'),
+            _count_where((Trade.direction == 'short') & is_win).label('short_wins'),
+            _count_where(Trade.is_a_grade.is_(True)).label('a_grade_count'),
+            _count_where(Trade.is_a_grade.is_(True) & is_win).label('a_grade_wins'),
+            db.func.coalesce(db.func.max(Trade.pnl_points), 0).label('best_trade'),
+            db.func.coalesce(db.func.min(Trade.pnl_points), 0).label('worst_trade')
+        ).filter(Trade.session_id == session_id).one()
+
+        # Only the last 10 trades are hydrated: newest first off the
+        # (session_id, created_at) index, id breaking ties between trades
+        # created in the same bulk batch, then restored to chronological order
+        recent_trades = db.session.query(Trade).filter_by(session_id=session_id).order_by(
+            Trade.created_at.desc(), Trade.id.desc()
+        ).limit(RECENT_TRADES_LIMIT).all()
+        recent_trades = list(reversed(recent_trades))
 
         stats = {
             'session': session.to_dict(),
-            'total_trades': len(trades),
+            'total_trades': totals.total_trades,
             'by_outcome': {
-                'wins': len(trades_by_outcome['win']),
-                'losses': len(trades_by_outcome['loss']),
-                'scratches': len(trades_by_outcome['scratch'])
+                'wins': totals.wins,
+                'losses': totals.losses,
+                'scratches': totals.scratches
             },
             'by_direction': {
-                'long': len(long_trades),
-                'short': len(short_trades),
-                'long_win_rate': (len([t for t in long_trades if t.outcome == 'win']) / len(long_trades) * 100)
-                if long_trades else 0,
-                'short_win_rate': (len([t for t in short_trades if t.outcome == 'win']) / len(short_trades) * 100)
-                if short_trades else 0
+                'long': totals.long_count,
+                'short': totals.short_count,
+                'long_win_rate': (totals.long_wins / totals.long_count * 100) if totals.long_count else 0,
+                'short_win_rate': (totals.short_wins / totals.short_count * 100) if totals.short_count else 0
             },
             'a_grade_setups': {
-                'total': len(a_grade_trades),
-                'wins': len(a_grade_wins),
-                'win_rate': (len(a_grade_wins) / len(a_grade_trades) * 100) if a_grade_trades else 0
+                'total': totals.a_grade_count,
+                'wins': totals.a_grade_wins,
+                'win_rate': (totals.a_grade_wins / totals.a_grade_count * 100) if totals.a_grade_count else 0
             },
             'pnl': {
                 'total': session.total_pnl,
                 'average': session.average_pnl,
-                'best_trade': max([t.pnl_points for t in trades], default=0),
-                'worst_trade': min([t.pnl_points for t in trades], default=0)
+                'best_trade': totals.best_trade,
+                'worst_trade': totals.worst_trade
             },
-            'recent_trades': [t.to_dict() for t in trades[-10:]]  # Last 10 trades
+            'recent_trades': [t.to_dict() for t in recent_trades]
         }
 
         return jsonify({
@@ -477,12 +681,12 @@ def get_session_stats(session_id):
 def get_session_trades(session_id):
     """Get all trades for a session"""
     try:
-        session = Session.query.get(session_id)
+        session = db.session.get(Session, session_id, options=[db.joinedload(Session.trades)])
 
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        trades = Trade.query.filter_by(session_id=session_id).order_by(Trade.created_at).all()
+        trades = session.trades
 
         return jsonify({
             'success': True,
@@ -497,30 +701,12 @@ def get_session_trades(session_id):
 @api_bp.route('/time-windows', methods=['GET'])
 def get_time_windows():
     """Get all available time windows"""
-    try:
-        windows = []
-        for key, window in Config.TIME_WINDOWS.items():
-            windows.append({
-                'key': key,
-                'label': window['label'],
-                'start': window['start'].strftime('%H:%M'),
-                'end': window['end'].strftime('%H:%M')
-            })
-
-        return jsonify({
-            'success': True,
-            'time_windows': windows
-        })
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return Response(TIME_WINDOWS_PAYLOAD, mimetype='application/json',
+                    headers={'Cache-Control': 'public, max-age=86400'})
 
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'German30 Trading Simulator',
-        'version': '1.0.0'
-    })
+    # Not cacheable: a probe must reach the live process
+    return Response(HEALTH_PAYLOAD, mimetype='application/json')
@@ -2,28 +2,47 @@
 View routes for German30 Trading Simulator
 """
 from flask import Blueprint, render_template
+from models import db
 from models.session import Session
 from models.trade import Trade
 
 views_bp = Blueprint('views', __name__)
 
+# Columns the session list templates render (win_rate derives from the
+# counters); the playlist JSON and bookkeeping columns are left unloaded
+SESSION_LIST_COLUMNS = db.load_only(
+    Session.id, Session.created_at, Session.date_range_start, Session.date_range_end,
+    Session.time_window, Session.total_trades, Session.winning_trades,
+    Session.total_pnl, Session.is_completed
+)
+
+# Columns the trade journal table renders
+TRADE_JOURNAL_COLUMNS = db.load_only(
+    Trade.entry_timestamp, Trade.direction, Trade.entry_price, Trade.exit_price,
+    Trade.outcome, Trade.pnl_points, Trade.notes
+)
+
 
 @views_bp.route('/')
 def index():
     """Landing page"""
     # Get recent sessions
-    recent_sessions = Session.query.order_by(Session.created_at.desc()).limit(5).all()
-
-    # Get total stats across all sessions
-    all_sessions = Session.query.all()
-    total_trades = sum(s.total_trades for s in all_sessions)
-    total_wins = sum(s.winning_trades for s in all_sessions)
-    total_pnl = sum(s.total_pnl for s in all_sessions)
+    recent_sessions = db.session.query(Session).options(SESSION_LIST_COLUMNS).order_by(
+        Session.created_at.desc()
+    ).limit(5).all()
+
+    # Get total stats across all sessions in one aggregate row
+    total_sessions, total_trades, total_wins, total_pnl = db.session.query(
+        db.func.count(Session.id),
+        db.func.coalesce(db.func.sum(Session.total_trades), 0),
+        db.func.coalesce(db.func.sum(Session.winning_trades), 0),
+        db.func.coalesce(db.func.sum(Session.total_pnl), 0.0)
+    ).one()
 
     overall_win_rate = (total_wins / total_trades * 100) if total_trades > 0 else 0
 
     stats = {
-        'total_sessions': len(all_sessions),
+        'total_sessions': total_sessions,
         'total_trades': total_trades,
         'overall_win_rate': round(overall_win_rate, 2),
         'total_pnl': round(total_pnl, 2)
@@ -45,22 +64,28 @@ def simulator():
 @views_bp.route('/simulator/<int:session_id>')
 def simulator_session(session_id):
     """Simulator with specific session loaded"""
-    session = Session.query.get_or_404(session_id)
+    session = db.get_or_404(Session, session_id)
     return render_template('simulator.html', session=session)
 
 
 @views_bp.route('/stats')
 def stats():
     """Statistics dashboard - all sessions"""
-    sessions = Session.query.order_by(Session.created_at.desc()).all()
+    sessions = db.session.query(Session).options(SESSION_LIST_COLUMNS).order_by(
+        Session.created_at.desc()
+    ).all()
     return render_template('stats.html', sessions=sessions)
 
 
 @views_bp.route('/stats/<int:session_id>')
 def session_stats(session_id):
     """Statistics dashboard for specific session"""
-    session = Session.query.get_or_404(session_id)
-    trades = Trade.query.filter_by(session_id=session_id).order_by(Trade.created_at).all()
+    session = db.get_or_404(Session, session_id)
+
+    # Full journal, loading only the displayed columns
+    trades = db.session.query(Trade).options(TRADE_JOURNAL_COLUMNS).filter_by(session_id=session_id).order_by(
+        Trade.created_at
+    ).all()
 
     return render_template(
         'stats.html',
@@ -0,0 +1,65 @@
+"""
+Trade scoring kernels - first SL/TP touch over a candle window
+
+numba is optional: when it is installed the scan is compiled, otherwise
+an equivalent NumPy implementation is used.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _scan_outcome_loop(highs, lows, sl, tp, is_long):
+    """
+    Single pass over the candles with early exit on the first SL/TP touch
+
+    Args:
+        highs: float64 array of candle highs after entry
+        lows: float64 array of candle lows after entry
+        sl: Stop loss price
+        tp: Take profit price
+        is_long: True for long trades, False for short
+
+    Returns:
+        (index, is_loss) of the deciding candle, or (-1, False) if none
+    """
+    for i in range(highs.shape[0]):
+        if is_long:
+            # SL is assumed hit first when one candle touches both
+            if lows[i] <= sl:
+                return i, True
+            if highs[i] >= tp:
+                return i, False
+        else:
+            if highs[i] >= sl:
+                return i, True
+            if lows[i] <= tp:
+                return i, False
+    return -1, False
+
+
+def _scan_outcome_numpy(highs, lows, sl, tp, is_long):
+    """NumPy equivalent of _scan_outcome_loop, used without numba"""
+    if is_long:
+        sl_hit, tp_hit = lows <= sl, highs >= tp
+    else:
+        sl_hit, tp_hit = highs >= sl, lows <= tp
+
+    touched = sl_hit | tp_hit
+    if not touched.any():
+        return -1, False
+
+    index = int(touched.argmax())
+    return index, bool(sl_hit[index])
+
+
+scan_outcome = njit(cache=True)(_scan_outcome_loop) if njit is not None else _scan_outcome_numpy
+
+
+def warm_up():
+    """Trigger (or load the cached) compilation before the first request"""
+    sample = np.zeros(1, dtype='f8')
+    scan_outcome(sample, sample, 0.0, 0.0, True)